@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import BooleanField, Case, Value, When
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .models import User, PatientProfile, DoctorProfile, Document, Prescription, Payment, Appointment, DoctorAvailability
@@ -22,8 +24,6 @@ class UserAdmin(BaseUserAdmin):
                 "is_active",
                 "is_staff",
                 "is_superuser",
-                "groups",
-                "user_permissions",
             )
         }),
         (_("Important dates"), {"fields": ("last_login",)}),
@@ -37,29 +37,39 @@ class UserAdmin(BaseUserAdmin):
     )
 
     # We don't use username, so tell UserAdmin to treat email as the main id
-    filter_horizontal = ("groups", "user_permissions")
+    filter_horizontal = ()
 
 
 @admin.register(PatientProfile)
 class PatientProfileAdmin(admin.ModelAdmin):
     list_display = ("full_name", "user", "contact_number")
+    raw_id_fields = ("user",)
+    list_select_related = ("user",)
     search_fields = ("full_name", "user__email")
 
 
 @admin.register(DoctorProfile)
 class DoctorProfileAdmin(admin.ModelAdmin):
     list_display = ("full_name", "specialization", "license_number")
+    raw_id_fields = ("user",)
+    list_select_related = ("user",)
     search_fields = ("full_name", "specialization", "license_number")
 
 @admin.register(DoctorAvailability)
 class DoctorAvailabilityAdmin(admin.ModelAdmin):
     list_display = ("doctor", "date", "start_time", "end_time", "created_at")
+    raw_id_fields = ("doctor",)
+    list_select_related = ("doctor",)
     list_filter = ("doctor", "date")
     search_fields = ("doctor__email",)
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
     list_display = ("file_name", "document_type", "owner_user", "uploaded_by_user", "created_at")
+    list_select_related = ("owner_user", "uploaded_by_user")
+    raw_id_fields = ("owner_user", "uploaded_by_user")
+    list_per_page = 50
+    show_full_result_count = False
     list_filter = ("document_type",)
     search_fields = ("file_name", "owner_user__email", "uploaded_by_user__email")
 
@@ -67,17 +77,65 @@ class DocumentAdmin(admin.ModelAdmin):
 @admin.register(Prescription)
 class PrescriptionAdmin(admin.ModelAdmin):
     list_display = ("title", "patient", "doctor", "status", "created_at")
+    list_select_related = ("patient", "doctor")
+    raw_id_fields = ("patient", "doctor")
+    list_per_page = 50
+    show_full_result_count = False
     list_filter = ("status",)
     search_fields = ("title", "patient__email", "doctor__email")
+    actions = ("mark_completed",)
+
+    @admin.action(description="Mark selected prescriptions as completed")
+    def mark_completed(self, request, queryset):
+        updated = queryset.update(status="completed")
+        self.message_user(request, f"Marked {updated} prescription(s) as completed.")
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ("user", "amount_cents", "currency", "status", "created_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
     list_filter = ("status", "currency")
+    list_per_page = 50
+    show_full_result_count = False
     search_fields = ("user__email", "stripe_session_id", "description")
 
 @admin.register(Appointment)
 class AppointmentAdmin(admin.ModelAdmin):
-    list_display = ("patient", "doctor", "scheduled_for", "status", "is_paid", "created_at")
+    list_display = ("patient", "doctor", "scheduled_for", "status", "paid", "created_at")
+    list_select_related = ("patient", "doctor", "payment")
+    raw_id_fields = ("patient", "doctor", "payment", "rescheduled_from")
+    list_per_page = 50
+    show_full_result_count = False
     list_filter = ("status", "doctor", "patient")
     search_fields = ("patient__email", "doctor__email", "reason")
+    actions = ("mark_completed", "mark_cancelled")
+
+    # Bulk status changes as one UPDATE instead of N save() calls.
+    @admin.action(description="Mark selected appointments as completed")
+    def mark_completed(self, request, queryset):
+        updated = queryset.update(
+            status=Appointment.Status.COMPLETED, updated_at=timezone.now()
+        )
+        self.message_user(request, f"Marked {updated} appointment(s) as completed.")
+
+    @admin.action(description="Mark selected appointments as cancelled")
+    def mark_cancelled(self, request, queryset):
+        updated = queryset.update(
+            status=Appointment.Status.CANCELLED, updated_at=timezone.now()
+        )
+        self.message_user(request, f"Marked {updated} appointment(s) as cancelled.")
+
+    def get_queryset(self, request):
+        # Compute "paid" once in SQL instead of dereferencing payment per row.
+        return super().get_queryset(request).annotate(
+            _is_paid=Case(
+                When(payment__status="paid", then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+
+    @admin.display(boolean=True, description="Paid")
+    def paid(self, obj):
+        return obj._is_paid
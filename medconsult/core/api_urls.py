@@ -0,0 +1,20 @@
+from sys import intern as _n
+
+from django.urls import path
+
+from core import views
+
+# Bind the view callables once; anything that rebuilds path() objects
+# (tests overriding ROOT_URLCONF, autoreload) reuses these instead of
+# re-running as_view() per pattern.
+patient_signup = views.PatientSignupView.as_view()
+doctor_signup = views.DoctorSignupView.as_view()
+api_login = views.LoginView.as_view()
+api_me = views.MeView.as_view()
+
+urlpatterns = (
+    path("signup/patient/", patient_signup, name=_n("api-patient-signup")),
+    path("signup/doctor/", doctor_signup, name=_n("api-doctor-signup")),
+    path("login/", api_login, name=_n("api-login")),
+    path("me/", api_me, name=_n("api-me")),
+)
@@ -1,7 +1,47 @@
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from django.http import HttpResponse
 from django.utils import timezone
 from django.conf import settings
 
 
+@lru_cache(maxsize=64)
+def get_zoneinfo(name):
+    """Cached tzname -> ZoneInfo lookup, so activation skips zoneinfo parsing."""
+    return ZoneInfo(name)
+
+
+# path -> (body, content type) for requests that should never reach the
+# session/auth/resolver machinery.
+_FAST_PATHS = {
+    "/healthz": (b"ok\n", "text/plain"),
+    "/robots.txt": (b"User-agent: *\nDisallow:\n", "text/plain"),
+    "/favicon.ico": (b"", "image/x-icon"),
+}
+
+
+class FastPathMiddleware:
+    """Answer probe/crawler paths before the rest of the stack runs.
+
+    First in MIDDLEWARE: a health check or favicon request costs one dict
+    lookup and a constant-body response instead of session load, auth and
+    URL resolution. The response object itself is built per request —
+    handlers mutate headers, so a shared instance isn't safe to return.
+    """
+
+    __slots__ = ("get_response",)
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        hit = _FAST_PATHS.get(request.path)
+        if hit is not None:
+            return HttpResponse(hit[0], content_type=hit[1])
+        return self.get_response(request)
+
+
 class UserTimezoneMiddleware:
     """
     Order:
@@ -10,10 +50,24 @@ class UserTimezoneMiddleware:
     3) settings.TIME_ZONE
     """
 
+    __slots__ = ("get_response", "skip_prefixes")
+
     def __init__(self, get_response):
         self.get_response = get_response
 
+        # Static/media responses never render tz-aware content, so don't pay
+        # the session/user lookup for them.
+        prefixes = []
+        for url in (settings.STATIC_URL, settings.MEDIA_URL):
+            if url:
+                prefixes.append(url if url.startswith("/") else "/" + url)
+        prefixes.append("/favicon.ico")
+        self.skip_prefixes = tuple(prefixes)
+
     def __call__(self, request):
+        if request.path.startswith(self.skip_prefixes):
+            return self.get_response(request)
+
         tz_name = None
 
         user = getattr(request, "user", None)
@@ -25,7 +79,7 @@ class UserTimezoneMiddleware:
             tz_name = getattr(settings, "TIME_ZONE", "UTC")
 
         try:
-            timezone.activate(tz_name)
+            timezone.activate(get_zoneinfo(tz_name))
         except Exception:
             timezone.deactivate()
 
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-08-27 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_alter_user_timezone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'scheduled_for'], name='core_appoin_doctor__56dde0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'status'], name='core_appoin_patient_c1b6c4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status'], name='core_appoin_status_e978b8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctoravailability',
+            index=models.Index(fields=['doctor', 'date'], name='core_doctor_doctor__51a8c7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['owner_user', 'document_type'], name='core_docume_owner_u_babb8d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['user', 'status'], name='core_paymen_user_id_409bee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['stripe_session_id'], name='core_paymen_stripe__fce7a5_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-08-27 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0012_appointment_core_appoin_doctor__56dde0_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.CheckConstraint(condition=models.Q(('role__in', ['patient', 'doctor', 'admin'])), name='role_valid'),
+        ),
+    ]
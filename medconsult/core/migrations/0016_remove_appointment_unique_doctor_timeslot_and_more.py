@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-08-27 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_alter_doctorprofile_user_alter_patientprofile_user'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='appointment',
+            name='unique_doctor_timeslot',
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['cancelled', 'rejected', 'rescheduled']), _negated=True), fields=('doctor', 'scheduled_for'), name='uniq_active_slot'),
+        ),
+    ]
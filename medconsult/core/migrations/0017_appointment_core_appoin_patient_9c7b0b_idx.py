@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-08-27 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_remove_appointment_unique_doctor_timeslot_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'scheduled_for'], name='core_appoin_patient_9c7b0b_idx'),
+        ),
+    ]
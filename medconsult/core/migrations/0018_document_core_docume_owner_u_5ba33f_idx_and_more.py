@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-08-27 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_appointment_core_appoin_patient_9c7b0b_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['owner_user', '-created_at'], name='core_docume_owner_u_5ba33f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['patient', '-created_at'], name='core_prescr_patient_ba2b9c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['doctor', '-created_at'], name='core_prescr_doctor__7b4c29_idx'),
+        ),
+    ]
@@ -1,15 +1,15 @@
-from datetime import time 
+from datetime import time
+from functools import cached_property
 import uuid
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import (
     AbstractBaseUser,
-    PermissionsMixin,
     BaseUserManager,
 )
-from django.db import models
-from django.core.exceptions import ValidationError 
+from django.db import models, transaction
 
-from django.conf import settings 
+from django.conf import settings
 
 # ==========================
 # USER & AUTH MODELS
@@ -39,8 +39,44 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def bulk_create_patients(self, records, batch_size=None):
+        """
+        Batch variant of the signup flow for imports/seeding.
+
+        `records` is an iterable of dicts with "email", "password" and the
+        PatientProfile fields. Users and profiles are each inserted with one
+        bulk_create inside a single transaction instead of 2 INSERTs (and 2
+        commits) per signup.
+        """
+        if batch_size is None:
+            batch_size = getattr(settings, "BULK_BATCH_SIZE", 500)
+
+        records = list(records)
+        users = [
+            self.model(
+                id=uuid.uuid4(),
+                email=self.normalize_email(rec["email"]),
+                password=make_password(rec["password"]),
+                role="patient",
+            )
+            for rec in records
+        ]
+
+        with transaction.atomic():
+            self.bulk_create(users, batch_size=batch_size)
+            profiles = [
+                PatientProfile(
+                    user=user,
+                    **{k: v for k, v in rec.items() if k not in ("email", "password")},
+                )
+                for user, rec in zip(users, records)
+            ]
+            PatientProfile.objects.bulk_create(profiles, batch_size=batch_size)
 
-class User(AbstractBaseUser, PermissionsMixin):
+        return users
+
+
+class User(AbstractBaseUser):
     ROLE_CHOICES = (
         ("patient", "Patient"),
         ("doctor", "Doctor"),
@@ -72,32 +108,42 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    is_superuser = models.BooleanField(default=False)
 
     objects = UserManager()
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(role__in=["patient", "doctor", "admin"]),
+                name="role_valid",
+            )
+        ]
 
 
-    def get_display_name(self):
+
+    @cached_property
+    def display_name(self):
         """
         Return a human-friendly display name for this user:
         - patient → PatientProfile.full_name
         - doctor → DoctorProfile.full_name
         - fallback → user.email
+
+        Cached per instance, so repeated template/serializer access only
+        touches the reverse profile relations once. Callers that render many
+        users should select_related("patient_profile", "doctor_profile").
         """
-        # Try patient profile
-        for attr in ("patient_profile", "patientprofile"):
-            profile = getattr(self, attr, None)
-            if profile and getattr(profile, "full_name", None):
-                return profile.full_name
-
-        # Try doctor profile
-        for attr in ("doctor_profile", "doctorprofile"):
-            profile = getattr(self, attr, None)
-            if profile and getattr(profile, "full_name", None):
-                return profile.full_name
+        profile = getattr(self, "patient_profile", None)
+        if profile and profile.full_name:
+            return profile.full_name
+
+        profile = getattr(self, "doctor_profile", None)
+        if profile and profile.full_name:
+            return profile.full_name
 
         return self.email
 
@@ -116,6 +162,18 @@ class User(AbstractBaseUser, PermissionsMixin):
     def is_admin(self):
         return self.role == "admin"
 
+    # Minimal replacement for PermissionsMixin: this app has three roles and
+    # no per-object permissions, so groups/user_permissions were dead weight
+    # and their JOINs ran on every admin permission check.
+    def has_perm(self, perm, obj=None):
+        return self.is_active and (self.is_superuser or self.role == "admin")
+
+    def has_perms(self, perm_list, obj=None):
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    def has_module_perms(self, app_label):
+        return self.is_active and (self.is_superuser or self.role == "admin")
+
 
 # ==========================
 # PROFILE MODELS
@@ -128,6 +186,7 @@ class PatientProfile(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name="patient_profile",
+        limit_choices_to={"role": "patient"},
     )
     full_name = models.CharField(max_length=255)
     date_of_birth = models.CharField(max_length=50)  # kept as text for now
@@ -141,12 +200,7 @@ class PatientProfile(models.Model):
         blank=True,
         null=True,
     )
-    
-    def clean(self):
-        super().clean()
-        if self.user.role != "patient":
-            raise ValidationError("PatientProfile.user must have role='patient'.")
-        
+
     def __str__(self):
         return f"PatientProfile({self.full_name})"
 
@@ -157,6 +211,7 @@ class DoctorProfile(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name="doctor_profile",
+        limit_choices_to={"role": "doctor"},
     )
     full_name = models.CharField(max_length=255)
     specialization = models.CharField(max_length=255)
@@ -167,11 +222,6 @@ class DoctorProfile(models.Model):
     clinic_address = models.TextField(blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
 
-    def clean(self):
-        super().clean()
-        if self.user.role != "doctor":
-            raise ValidationError("DoctorProfile.user must have role='doctor'.")
-        
     def __str__(self):
         return f"DoctorProfile({self.full_name}, {self.specialization})"
 
@@ -185,8 +235,11 @@ def document_upload_path(instance, filename):
     """
     Store documents under:
     documents/<owner_user_id>/<uuid>_<filename>
+
+    Reads the FK column attr (owner_user_id) so building the path never
+    lazy-loads the user row.
     """
-    return f"documents/{instance.owner_user.id}/{uuid.uuid4()}_{filename}"
+    return f"documents/{instance.owner_user_id}/{uuid.uuid4().hex}_{filename}"
 
 
 def prescription_upload_path(instance, filename):
@@ -194,17 +247,16 @@ def prescription_upload_path(instance, filename):
     Store prescription files under:
     prescriptions/<patient_id>/<uuid>_<filename>
     """
-    return f"prescriptions/{instance.patient.id}/{uuid.uuid4()}_{filename}"
+    return f"prescriptions/{instance.patient_id}/{uuid.uuid4().hex}_{filename}"
 
 
 class Document(models.Model):
-    DOCUMENT_TYPE_CHOICES = (
-        ("lab_report", "Lab Report"),
-        ("id_proof", "ID Proof"),
-        ("scan", "Scan"),
-        ("prescription", "Prescription"),
-        ("other", "Other"),
-    )
+    class DocumentType(models.TextChoices):
+        LAB_REPORT = "lab_report", "Lab Report"
+        ID_PROOF = "id_proof", "ID Proof"
+        SCAN = "scan", "Scan"
+        PRESCRIPTION = "prescription", "Prescription"
+        OTHER = "other", "Other"
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     owner_user = models.ForeignKey(
@@ -229,10 +281,17 @@ class Document(models.Model):
     file = models.FileField(upload_to=document_upload_path)
     document_type = models.CharField(
         max_length=50,
-        choices=DOCUMENT_TYPE_CHOICES,
+        choices=DocumentType.choices,
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner_user", "document_type"]),
+            # Serves the documents list's ORDER BY created_at DESC + LIMIT.
+            models.Index(fields=["owner_user", "-created_at"]),
+        ]
+
     def __str__(self):
         return f"Document({self.file_name}, {self.document_type})"
 
@@ -268,6 +327,13 @@ class Prescription(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Serve each role's prescription list (newest first) from an index.
+            models.Index(fields=["patient", "-created_at"]),
+            models.Index(fields=["doctor", "-created_at"]),
+        ]
+
     def __str__(self):
         return f"Prescription({self.title})"
 
@@ -278,12 +344,11 @@ class Prescription(models.Model):
 
 
 class Payment(models.Model):
-    STATUS_CHOICES = (
-        ("created", "Created"),
-        ("pending", "Pending"),
-        ("paid", "Paid"),
-        ("failed", "Failed"),
-    )
+    class Status(models.TextChoices):
+        CREATED = "created", "Created"
+        PENDING = "pending", "Pending"
+        PAID = "paid", "Paid"
+        FAILED = "failed", "Failed"
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(
@@ -296,16 +361,22 @@ class Payment(models.Model):
     stripe_session_id = models.CharField(max_length=255, blank=True, null=True)
     status = models.CharField(
         max_length=20,
-        choices=STATUS_CHOICES,
-        default="created",
+        choices=Status.choices,
+        default=Status.CREATED,
     )
     description = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "status"]),
+            models.Index(fields=["stripe_session_id"]),
+        ]
+
     def __str__(self):
-        amount = self.amount_cents / 100 if self.amount_cents is not None else 0
-        return f"Payment({self.user.email}, {amount:.2f} {self.currency}, {self.status})"
+        dollars, cents = divmod(self.amount_cents or 0, 100)
+        return f"Payment({self.user.email}, {dollars}.{cents:02d} {self.currency}, {self.status})"
 
 
 # ==========================
@@ -314,15 +385,14 @@ class Payment(models.Model):
 
 
 class Appointment(models.Model):
-    STATUS_CHOICES = (
-        ("requested", "Requested"),
-        ("approved", "Approved"),
-        ("rejected", "Rejected"),
-        ("completed", "Completed"),
-        ("cancelled", "Cancelled"),
-        ("reschedule_requested", "Reschedule Requested"),
-        ("rescheduled", "Rescheduled"),
-    )
+    class Status(models.TextChoices):
+        REQUESTED = "requested", "Requested"
+        APPROVED = "approved", "Approved"
+        REJECTED = "rejected", "Rejected"
+        COMPLETED = "completed", "Completed"
+        CANCELLED = "cancelled", "Cancelled"
+        RESCHEDULE_REQUESTED = "reschedule_requested", "Reschedule Requested"
+        RESCHEDULED = "rescheduled", "Rescheduled"
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     patient = models.ForeignKey(
@@ -349,8 +419,8 @@ class Appointment(models.Model):
     reason = models.TextField(blank=True, null=True)
     status = models.CharField(
         max_length=20,
-        choices=STATUS_CHOICES,
-        default="requested",
+        choices=Status.choices,
+        default=Status.REQUESTED,
     )
     payment = models.ForeignKey(
         "Payment",
@@ -364,11 +434,22 @@ class Appointment(models.Model):
 
     class Meta:
         constraints = [
+            # Only live bookings contend for a slot; cancelled/rejected/
+            # rescheduled rows may share a timeslot so history is kept.
+            # Doubles as the index behind the booking conflict checks and
+            # lets bulk_create(ignore_conflicts=True) race-protect inserts.
             models.UniqueConstraint(
                 fields=["doctor", "scheduled_for"],
-                name="unique_doctor_timeslot",
+                condition=~models.Q(status__in=["cancelled", "rejected", "rescheduled"]),
+                name="uniq_active_slot",
             )
         ]
+        indexes = [
+            models.Index(fields=["doctor", "scheduled_for"]),
+            models.Index(fields=["patient", "scheduled_for"]),
+            models.Index(fields=["patient", "status"]),
+            models.Index(fields=["status"]),
+        ]
 
     def __str__(self):
         return (
@@ -380,6 +461,25 @@ class Appointment(models.Model):
     def is_paid(self):
         return self.payment is not None and self.payment.status == "paid"
 
+    @cached_property
+    def group_key(self):
+        """
+        Everything that must match for two consecutive 30-minute slots to
+        merge into one display block (see views.group_appointments). One
+        cached tuple comparison per row instead of seven attribute reads.
+        Includes rescheduled_from_id so a reschedule request never merges
+        with the block it replaces.
+        """
+        return (
+            self.doctor_id,
+            self.patient_id,
+            self.scheduled_for.date(),
+            self.status,
+            self.reason,
+            self.payment_id,
+            self.rescheduled_from_id or None,
+        )
+
 
 class DoctorAvailability(models.Model):
     """
@@ -404,6 +504,9 @@ class DoctorAvailability(models.Model):
     class Meta:
         ordering = ["doctor", "date", "start_time"]
         verbose_name_plural = "Doctor availability"
+        indexes = [
+            models.Index(fields=["doctor", "date"]),
+        ]
 
     def __str__(self):
         return f"{self.doctor.email} {self.date} {self.start_time}-{self.end_time}"
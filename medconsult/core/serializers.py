@@ -1,15 +1,38 @@
+import copy
+
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 from .models import User, PatientProfile, DoctorProfile
 
 
-class UserSerializer(serializers.ModelSerializer):
+# Unbound field maps per serializer class, built once on first use.
+_FIELD_CACHE: dict[type, dict] = {}
+
+
+class CachedFieldsMixin:
+    """
+    Reuse each serializer class's field map instead of rebuilding it per
+    request. DRF's get_fields() deep-copies every declared field on every
+    instantiation, which profiles as the hottest part of the auth endpoints.
+    The cached template is never bound — each call hands out shallow copies,
+    so binding mutates only the per-request copy. Only safe for flat scalar
+    fields (no nested serializers sharing a child), which is all we declare.
+    """
+
+    def get_fields(self):
+        template = _FIELD_CACHE.get(type(self))
+        if template is None:
+            template = _FIELD_CACHE[type(self)] = super().get_fields()
+        return {name: copy.copy(f) for name, f in template.items()}
+
+
+class UserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "email", "role", "created_at"]
 
 
-class PatientSignupSerializer(serializers.Serializer):
+class PatientSignupSerializer(CachedFieldsMixin, serializers.Serializer):
     # user fields
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True, min_length=6)
@@ -43,7 +66,7 @@ class PatientSignupSerializer(serializers.Serializer):
         return user
 
 
-class DoctorSignupSerializer(serializers.Serializer):
+class DoctorSignupSerializer(CachedFieldsMixin, serializers.Serializer):
     # user fields
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True, min_length=6)
@@ -77,7 +100,7 @@ class DoctorSignupSerializer(serializers.Serializer):
         return user
 
 
-class LoginSerializer(serializers.Serializer):
+class LoginSerializer(CachedFieldsMixin, serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
 
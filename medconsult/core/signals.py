@@ -0,0 +1,59 @@
+"""
+Cache invalidation hooks. Imported for their side effects from
+CoreConfig.ready(); the cached reads live next to their views.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Appointment, DoctorAvailability, DoctorProfile, User
+
+# Cached list backing the booking form's doctor dropdown.
+ACTIVE_DOCTORS_CACHE_KEY = "active_doctors_v1"
+
+
+def slots_cache_key(doctor_id, day):
+    return f"slots:{doctor_id}:{day.isoformat()}"
+
+
+def invalidate_slots(doctor_id, day):
+    """
+    Drop the cached slot list around a date. Slot caches are keyed by the
+    doctor-local date, but a stored UTC timestamp can fall on the
+    neighbouring local date, so both neighbours are dropped too. Also called
+    directly from views after bulk_create/bulk_update, which fire no signals.
+    """
+    cache.delete_many([
+        slots_cache_key(doctor_id, day - timedelta(days=1)),
+        slots_cache_key(doctor_id, day),
+        slots_cache_key(doctor_id, day + timedelta(days=1)),
+    ])
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_available_slots(sender, instance, **kwargs):
+    invalidate_slots(instance.doctor_id, instance.scheduled_for.date())
+
+
+@receiver(post_save, sender=DoctorAvailability)
+@receiver(post_delete, sender=DoctorAvailability)
+def invalidate_available_slots_window(sender, instance, **kwargs):
+    invalidate_slots(instance.doctor_id, instance.date)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_active_doctors(sender, instance, **kwargs):
+    # Patient signups are frequent and never change the doctor list.
+    if instance.role == "doctor":
+        cache.delete(ACTIVE_DOCTORS_CACHE_KEY)
+
+
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_delete, sender=DoctorProfile)
+def invalidate_active_doctors_profile(sender, instance, **kwargs):
+    # The cached entries carry the profile name/specialization they render.
+    cache.delete(ACTIVE_DOCTORS_CACHE_KEY)
@@ -0,0 +1,85 @@
+"""Segment-trie dispatch for the fully static routes.
+
+Django's ``URLResolver`` runs one compiled regex per candidate pattern
+until something matches. Almost every route in this project is a fixed
+path with no converters, so those can be resolved with one dict lookup
+per path segment instead. The middleware below builds that trie once
+from the real URLconf and dispatches straight to the view on a hit,
+falling through to Django's resolver for everything else (converters,
+admin, media).
+
+Dispatch is limited to GET/HEAD: bypassing the resolver also bypasses
+``CsrfViewMiddleware.process_view``, which must still see every POST.
+"""
+
+from asgiref.sync import iscoroutinefunction
+
+from django.urls import get_resolver
+from django.urls.resolvers import RoutePattern, URLPattern, URLResolver
+
+# Leaf marker; no path segment can collide with it because segments never
+# contain "/".
+_LEAF = "view/"
+
+
+def _insert(trie, segments, view):
+    node = trie
+    for seg in segments:
+        node = node.setdefault(seg, {})
+    node.setdefault(_LEAF, view)
+
+
+def _walk(patterns, prefix, trie):
+    for entry in patterns:
+        pattern = entry.pattern
+        if not isinstance(pattern, RoutePattern) or pattern.converters:
+            continue
+        route = prefix + str(pattern)
+        if isinstance(entry, URLPattern):
+            # A sync middleware can't await an async view's coroutine;
+            # leave those to the handler, which adapts them itself. DRF
+            # views (as_view() sets .cls) return deferred responses that
+            # only the handler's template-response hook renders, so they
+            # stay on Django's resolver too.
+            if iscoroutinefunction(entry.callback) or hasattr(entry.callback, "cls"):
+                continue
+            _insert(trie, [s for s in route.split("/") if s], entry.callback)
+        elif isinstance(entry, URLResolver) and entry.namespace is None:
+            # Descend into plain include()s; namespaced trees (admin) keep
+            # their own dispatch wrappers and stay on Django's resolver.
+            _walk(entry.url_patterns, route, trie)
+
+
+def build_route_trie():
+    trie = {}
+    _walk(get_resolver().url_patterns, "", trie)
+    return trie
+
+
+class TrieResolverMiddleware:
+    """Resolve static GET/HEAD paths with dict lookups, skip the regex scan.
+
+    Must be last in MIDDLEWARE so every earlier middleware (session, auth,
+    timezone) has already run when the view is called.
+    """
+
+    __slots__ = ("get_response", "trie")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.trie = build_route_trie()
+
+    def __call__(self, request):
+        path = request.path_info
+        if request.method in ("GET", "HEAD") and path.endswith("/"):
+            node = self.trie
+            for seg in path.split("/"):
+                if seg:
+                    node = node.get(seg)
+                    if node is None:
+                        break
+            else:
+                view = node.get(_LEAF)
+                if view is not None:
+                    return view(request)
+        return self.get_response(request)
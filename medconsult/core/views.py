@@ -1,7 +1,15 @@
+import re
+
 import stripe
+from PIL import Image, UnidentifiedImageError
+from dataclasses import dataclass, field
+from itertools import chain
 from datetime import datetime, date, time, timedelta
-from functools import wraps
-from zoneinfo import ZoneInfo, available_timezones
+from functools import lru_cache, wraps
+from inspect import iscoroutinefunction
+from zoneinfo import available_timezones
+
+from asgiref.sync import sync_to_async
 
 from django.conf import settings
 from django.contrib import messages
@@ -12,15 +20,20 @@ from django.contrib.auth import (
     update_session_auth_hash,
 )
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.core.paginator import Paginator
 from django.http import (
     HttpResponseBadRequest,
     HttpResponseNotAllowed,
     HttpResponseForbidden,
+    HttpResponseRedirect,
 )
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
+from django.db import IntegrityError, transaction
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Exists, Q
+from django.views.generic import RedirectView
 
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
@@ -34,6 +47,8 @@ from .models import (
     Document,
     Prescription,
 )
+from .middleware import get_zoneinfo
+from .signals import ACTIVE_DOCTORS_CACHE_KEY, invalidate_slots, slots_cache_key
 from .serializers import (
     UserSerializer,
     PatientSignupSerializer,
@@ -45,12 +60,41 @@ from .serializers import (
 # ==============================================================
 #  STRIPE CONFIGURATION
 # ==============================================================
-stripe.api_key = settings.STRIPE_SECRET_KEY
+def _stripe():
+    """
+    Configure the Stripe SDK on first use rather than at import time, so
+    importing this module (management commands, migrations, tests) doesn't
+    pay for Stripe setup or force eager settings access.
+    """
+    if not stripe.api_key:
+        stripe.api_key = settings.STRIPE_SECRET_KEY
+        # One keep-alive requests session per worker instead of a fresh TLS
+        # handshake per API call, with SDK-level retries for transient errors.
+        stripe.default_http_client = stripe.RequestsClient(timeout=10)
+        stripe.max_network_retries = 2
+    return stripe
 
 # ==============================================================
 #  TIMEZONE LIST (NO EXTRA DEPENDENCIES)
 # ==============================================================
 TIMEZONES = sorted(available_timezones())
+# Membership checks on submitted timezone names; the sorted list is only
+# for rendering the <select>.
+_TIMEZONE_SET = frozenset(TIMEZONES)
+
+# Passed explicitly to auth_login so it doesn't walk AUTHENTICATION_BACKENDS
+# and re-fetch the user to figure out which backend authenticated them.
+AUTH_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
+
+@lru_cache(maxsize=None)
+def _url(name):
+    """reverse() memoized for the fixed-path redirects in hot POST views.
+
+    Can't call reverse() at import (the URLconf isn't loaded yet), so the
+    first request pays the lookup and every later one hits the cache.
+    """
+    return reverse(name)
 
 
 # ==============================================================
@@ -62,17 +106,39 @@ def role_required(required_role):
     Admins always bypass permissions.
     """
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            # Async views get an async wrapper so Django's handler sees a
+            # coroutine function end to end; login_required is async-aware.
+            @wraps(view_func)
+            @login_required
+            async def _wrapped_async(request, *args, **kwargs):
+                role = request.session.get("role")
+                if role is None:
+                    user = await request.auser()
+                    role = user.role
+                    request.session["role"] = role
+
+                if role == "admin" or role == required_role:
+                    return await view_func(request, *args, **kwargs)
+
+                return HttpResponseForbidden(
+                    "You do not have permission to access this resource."
+                )
+            return _wrapped_async
+
         @wraps(view_func)
         @login_required
         def _wrapped(request, *args, **kwargs):
-            user = request.user
+            # Prefer the role cached on the session at login/signup so the
+            # check does not have to load the User row. Fall back to the
+            # user (and repopulate) for sessions from before the cache.
+            role = request.session.get("role")
+            if role is None:
+                role = request.user.role
+                request.session["role"] = role
 
             # Admin can access everything
-            if getattr(user, "is_admin", False):
-                return view_func(request, *args, **kwargs)
-
-            # Normal role match
-            if user.role == required_role:
+            if role == "admin" or role == required_role:
                 return view_func(request, *args, **kwargs)
 
             return HttpResponseForbidden("You do not have permission to access this resource.")
@@ -93,6 +159,26 @@ def logout_view(request):
 # ==============================================================
 #  DATA NORMALIZATION HELPERS
 # ==============================================================
+_DOB_RE = re.compile(
+    r"^\s*(?:"
+    r"(?P<y1>\d{4})-(?P<m1>\d{1,2})-(?P<d1>\d{1,2})"        # 1992-06-27
+    r"|(?P<m2>\d{1,2})[/-](?P<d2>\d{1,2})[/-](?P<y2>\d{4})"  # 06/27/1992, 06-27-1992
+    r"|(?P<m3>\d{2})(?P<d3>\d{2})(?P<y3>\d{4})"              # 06271992
+    r")\s*$"
+)
+
+_NON_DIGIT = re.compile(r"\D")
+
+
+def _format_dob(year, month, day):
+    """Validate and format to YYYY-MM-DD, or return None if not a real date."""
+    try:
+        date(year, month, day)
+    except ValueError:
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
 def normalize_dob_input(raw: str | None) -> str | None:
     """
     Normalize date-of-birth inputs to YYYY-MM-DD.
@@ -105,24 +191,26 @@ def normalize_dob_input(raw: str | None) -> str | None:
     if not raw:
         return raw
     raw = raw.strip()
-    digits = "".join(ch for ch in raw if ch.isdigit())
 
-    # Interpret 06271992 as MMDDYYYY
-    if len(digits) == 8:
-        mm, dd, yyyy = digits[0:2], digits[2:4], digits[4:8]
-        try:
-            dt = datetime.strptime(f"{mm}/{dd}/{yyyy}", "%m/%d/%Y")
-            return dt.strftime("%Y-%m-%d")
-        except ValueError:
-            return raw
+    # One precompiled match instead of up to three strptime attempts, each of
+    # which raises and swallows a ValueError on the miss path.
+    m = _DOB_RE.match(raw)
+    if m:
+        if m.group("y1"):
+            y, mo, d = m.group("y1", "m1", "d1")
+        elif m.group("y2"):
+            mo, d, y = m.group("m2", "d2", "y2")
+        else:
+            mo, d, y = m.group("m3", "d3", "y3")
+        return _format_dob(int(y), int(mo), int(d)) or raw
 
-    # Try common formats
-    for fmt in ("%m/%d/%Y", "%Y-%m-%d"):
-        try:
-            dt = datetime.strptime(raw, fmt)
-            return dt.strftime("%Y-%m-%d")
-        except ValueError:
-            pass
+    # Fallback: strip separators and interpret 8 digits as MMDDYYYY. The
+    # regex sub runs in C, unlike a per-character generator expression.
+    digits = _NON_DIGIT.sub("", raw)
+    if len(digits) == 8:
+        formatted = _format_dob(int(digits[4:8]), int(digits[0:2]), int(digits[2:4]))
+        if formatted:
+            return formatted
 
     return raw
 
@@ -133,6 +221,27 @@ def normalize_dob_input(raw: str | None) -> str | None:
 SLOT_MINUTES = 30
 SLOT_DELTA = timedelta(minutes=SLOT_MINUTES)
 
+# Statuses that free up a slot for rebooking.
+CANCEL_STATES = frozenset({
+    Appointment.Status.CANCELLED,
+    Appointment.Status.REJECTED,
+    Appointment.Status.RESCHEDULED,
+})
+
+# Statuses a doctor may set from the block actions form ("rescheduled" is
+# reserved for the reschedule flow itself).
+VALID_STATUSES = frozenset({
+    Appointment.Status.REQUESTED,
+    Appointment.Status.APPROVED,
+    Appointment.Status.REJECTED,
+    Appointment.Status.COMPLETED,
+    Appointment.Status.CANCELLED,
+    Appointment.Status.RESCHEDULE_REQUESTED,
+})
+
+# Themes settings_view accepts; anything else leaves the preference untouched.
+VALID_THEMES = frozenset({"light", "dark"})
+
 
 def get_user_timezone(user):
     """
@@ -141,9 +250,9 @@ def get_user_timezone(user):
     """
     tz_name = getattr(user, "timezone", None) or getattr(settings, "TIME_ZONE", "UTC")
     try:
-        return ZoneInfo(tz_name)
+        return get_zoneinfo(tz_name)
     except Exception:
-        return ZoneInfo(getattr(settings, "TIME_ZONE", "UTC"))
+        return get_zoneinfo(getattr(settings, "TIME_ZONE", "UTC"))
 
 
 def get_available_slots_for_doctor(doctor: User, target_date: date):
@@ -154,185 +263,192 @@ def get_available_slots_for_doctor(doctor: User, target_date: date):
         - In the future
     NOTE: Returned datetimes are timezone-aware in doctor_tz.
     """
-    windows = DoctorAvailability.objects.filter(
-        doctor=doctor,
-        date=target_date,
-    ).order_by("start_time")
+    # A past day can never yield bookable slots — the `s > now` filter would
+    # drop them all — so skip both queries outright.
+    if target_date < timezone.localdate():
+        return []
 
-    if not windows.exists():
+    # One SELECT of just the two columns the loop reads; the old
+    # exists()-then-iterate pattern cost an extra EXISTS round trip.
+    windows = list(
+        DoctorAvailability.objects.filter(
+            doctor=doctor,
+            date=target_date,
+        )
+        .only("start_time", "end_time")
+        .order_by("start_time")
+    )
+
+    if not windows:
         return []
 
     doctor_tz = get_user_timezone(doctor)
+    day_start = datetime.combine(target_date, time(0, 0), tzinfo=doctor_tz)
 
-    # Full-day range in DOCTOR local time
-    start_of_day = timezone.make_aware(
-        datetime.combine(target_date, time(0, 0)),
-        doctor_tz,
-    )
-    end_of_day = timezone.make_aware(
-        datetime.combine(target_date, time(23, 59, 59)),
-        doctor_tz,
-    )
+    # Scan each window as integer minute offsets from midnight and build the
+    # aware datetime once per candidate, instead of combine()+make_aware per
+    # boundary and fresh datetimes on every loop step.
+    candidates = []
+    for w in windows:
+        start_min = w.start_time.hour * 60 + w.start_time.minute
+        end_min = w.end_time.hour * 60 + w.end_time.minute
+        for m in range(start_min, end_min - SLOT_MINUTES + 1, SLOT_MINUTES):
+            candidates.append(day_start + timedelta(minutes=m))
 
-    booked = set(
-        Appointment.objects.filter(
+    if not candidates:
+        return []
+
+    # Resolve "already booked" with one indexed lookup; compare epoch ints,
+    # which hash much faster than tz-aware datetimes.
+    booked = {
+        int(dt.timestamp())
+        for dt in Appointment.objects.filter(
             doctor=doctor,
-            scheduled_for__gte=start_of_day,
-            scheduled_for__lte=end_of_day,
+            scheduled_for__in=candidates,
         )
-        .exclude(status__in=["cancelled", "rejected", "rescheduled"])
+        .exclude(status__in=CANCEL_STATES)
         .values_list("scheduled_for", flat=True)
-    )
+    }
 
     now = timezone.now()
-    slots = []
-
-    for w in windows:
-        current_start = timezone.make_aware(
-            datetime.combine(target_date, w.start_time),
-            doctor_tz,
-        )
-        window_end = timezone.make_aware(
-            datetime.combine(target_date, w.end_time),
-            doctor_tz,
-        )
+    return [
+        (s, s + SLOT_DELTA)
+        for s in candidates
+        if s > now and int(s.timestamp()) not in booked
+    ]
 
-        while current_start + SLOT_DELTA <= window_end:
-            current_end = current_start + SLOT_DELTA
 
-            if current_start > now and current_start not in booked:
-                slots.append((current_start, current_end))
-
-            current_start = current_end
-
-    return slots
+def available_slots_cached(doctor, target_date):
+    """
+    get_available_slots_for_doctor behind a short per-(doctor, date) cache,
+    so concurrent viewers of the same calendar day share one computation.
+    core.signals drops the key on appointment/availability changes; the 30s
+    TTL also bounds staleness of the slots-in-the-past filter.
+    """
+    return cache.get_or_set(
+        slots_cache_key(doctor.id, target_date),
+        lambda: get_available_slots_for_doctor(doctor, target_date),
+        timeout=30,
+    )
 
 
 # ==============================================================
 #  APPOINTMENT GROUPING HELPERS
 # ==============================================================
-def group_appointments_for_patient(qs):
-    qs = qs.order_by("doctor__id", "scheduled_for")
-    blocks, current = [], None
-
-    for appt in qs:
-        day = appt.scheduled_for.date()
-
-        if current is None:
-            current = {
-                "doctor": appt.doctor,
-                "patient": appt.patient,
-                "date": day,
-                "start": appt.scheduled_for,
-                "end": appt.scheduled_for + SLOT_DELTA,
-                "status": appt.status,
-                "reason": appt.reason,
-                "payment": appt.payment,
-                "slot_ids": [str(appt.id)],
-                "slots": [appt],
-                "rescheduled_from": appt.rescheduled_from,
-            }
-            continue
+@dataclass(slots=True)
+class AppointmentBlock:
+    """
+    One contiguous run of 30-minute appointments, as the list templates
+    render it. slots=True keeps per-block memory at a fixed struct instead
+    of a nine-key dict, and Django's template variable resolution reads
+    attributes the same way it read the old dict keys.
+    """
 
-        last_start = current["slots"][-1].scheduled_for
-        same_block = (
-            appt.doctor_id == current["doctor"].id
-            and appt.patient_id == current["patient"].id
-            and day == current["date"]
-            and appt.status == current["status"]
-            and appt.reason == current["reason"]
-            and appt.payment_id == (current["payment"].id if current["payment"] else None)
-            and appt.scheduled_for == last_start + SLOT_DELTA
-            and (appt.rescheduled_from_id or None)
-            == (current["rescheduled_from"].id if current["rescheduled_from"] else None)
-        )
+    doctor: User
+    patient: User
+    date: date
+    start: datetime
+    status: str
+    reason: str
+    payment: Payment | None
+    rescheduled_from: "Appointment | None"
+    slots: list = field(default_factory=list)
+    slot_ranges: list = field(default_factory=list)
+    # Written once, when the block closes.
+    end: datetime | None = None
+
+
+def _group_appointments(qs, order_field, include_slot_ranges=False):
+    """
+    Merge consecutive 30-minute Appointment rows into AppointmentBlocks.
 
-        if same_block:
-            current["slots"].append(appt)
-            current["slot_ids"].append(str(appt.id))
-            current["end"] = appt.scheduled_for + SLOT_DELTA
-        else:
-            blocks.append(current)
-            current = {
-                "doctor": appt.doctor,
-                "patient": appt.patient,
-                "date": day,
-                "start": appt.scheduled_for,
-                "end": appt.scheduled_for + SLOT_DELTA,
-                "status": appt.status,
-                "reason": appt.reason,
-                "payment": appt.payment,
-                "slot_ids": [str(appt.id)],
-                "slots": [appt],
-                "rescheduled_from": appt.rescheduled_from,
-            }
-
-    if current:
-        blocks.append(current)
-
-    return blocks
-
-
-def group_appointments_for_doctor(qs):
-    qs = qs.order_by("patient__id", "scheduled_for")
-    blocks, current = [], None
-
-    for appt in qs:
-        day = appt.scheduled_for.date()
-
-        if current is None:
-            current = {
-                "doctor": appt.doctor,
-                "patient": appt.patient,
-                "date": day,
-                "start": appt.scheduled_for,
-                "end": appt.scheduled_for + SLOT_DELTA,
-                "status": appt.status,
-                "reason": appt.reason,
-                "payment": appt.payment,
-                "slot_ids": [str(appt.id)],
-                "slots": [appt],
-                "rescheduled_from": appt.rescheduled_from,
-            }
+    The patient and doctor lists were byte-identical copies of this loop,
+    differing only in the FK used to order (and therefore break) blocks;
+    `order_field` carries that difference. Yields blocks as they close so
+    callers can stream them without materializing the whole list.
+
+    With `include_slot_ranges` each block also carries per-slot
+    {id, start, end} dicts, built during the same pass instead of the
+    second loop the doctor list used to run over finished blocks.
+    """
+    current = None
+    current_sig = None
+    # Tracked as a local instead of re-deriving from the block every row;
+    # the block's "end" is written once, when the block closes.
+    expected_next_start = None
+
+    # iterator() skips the queryset result cache, so long histories stream
+    # through in chunks instead of materializing every row up front; the
+    # generator never re-iterates the queryset, so losing the cache is free.
+    for appt in qs.order_by(order_field, "scheduled_for").iterator(chunk_size=500):
+        start = appt.scheduled_for
+        # One tuple comparison (Appointment.group_key) instead of seven
+        # chained attribute reads per row.
+        sig = appt.group_key
+
+        if current is not None and sig == current_sig and start == expected_next_start:
+            current.slots.append(appt)
+            expected_next_start = start + SLOT_DELTA
+            if include_slot_ranges:
+                current.slot_ranges.append(
+                    {"id": appt.id, "start": start, "end": expected_next_start}
+                )
             continue
 
-        last_start = current["slots"][-1].scheduled_for
-        same_block = (
-            appt.doctor_id == current["doctor"].id
-            and appt.patient_id == current["patient"].id
-            and day == current["date"]
-            and appt.status == current["status"]
-            and appt.reason == current["reason"]
-            and appt.payment_id == (current["payment"].id if current["payment"] else None)
-            and appt.scheduled_for == last_start + SLOT_DELTA
-            and (appt.rescheduled_from_id or None)
-            == (current["rescheduled_from"].id if current["rescheduled_from"] else None)
+        if current is not None:
+            current.end = expected_next_start
+            yield current
+
+        current_sig = sig
+        expected_next_start = start + SLOT_DELTA
+        current = AppointmentBlock(
+            doctor=appt.doctor,
+            patient=appt.patient,
+            date=sig[2],  # group_key's day component; already computed
+            start=start,
+            status=appt.status,
+            reason=appt.reason,
+            payment=appt.payment,
+            rescheduled_from=appt.rescheduled_from,
+            slots=[appt],
         )
+        if include_slot_ranges:
+            current.slot_ranges.append(
+                {"id": appt.id, "start": start, "end": expected_next_start}
+            )
 
-        if same_block:
-            current["slots"].append(appt)
-            current["slot_ids"].append(str(appt.id))
-            current["end"] = appt.scheduled_for + SLOT_DELTA
-        else:
-            blocks.append(current)
-            current = {
-                "doctor": appt.doctor,
-                "patient": appt.patient,
-                "date": day,
-                "start": appt.scheduled_for,
-                "end": appt.scheduled_for + SLOT_DELTA,
-                "status": appt.status,
-                "reason": appt.reason,
-                "payment": appt.payment,
-                "slot_ids": [str(appt.id)],
-                "slots": [appt],
-                "rescheduled_from": appt.rescheduled_from,
-            }
-
-    if current:
-        blocks.append(current)
-
-    return blocks
+    if current is not None:
+        current.end = expected_next_start
+        yield current
+
+
+def _stream_blocks(gen):
+    """
+    Hand the grouping generator straight to the template, peeking one block
+    first: the list templates gate their table on `{% if appointment_blocks %}`
+    and a bare generator is always truthy. An empty list keeps the empty
+    state; otherwise blocks stream through without an intermediate list.
+    """
+    first = next(gen, None)
+    if first is None:
+        return []
+    return chain([first], gen)
+
+
+def group_appointments(qs, partition_by="doctor"):
+    """
+    Group a user's appointments for display, partitioned by the viewing role.
+
+    The doctor list breaks blocks per patient and needs per-slot ranges for
+    its cancel checkboxes; the patient list breaks per doctor. Both were
+    thin wrappers around `_group_appointments` — one entry point with the
+    role spelled out reads better at the call sites.
+    """
+    if partition_by == "doctor":
+        return _stream_blocks(
+            _group_appointments(qs, "patient__id", include_slot_ranges=True)
+        )
+    return _stream_blocks(_group_appointments(qs, "doctor__id"))
 
 
 # ==============================================================
@@ -342,6 +458,17 @@ def welcome_page(request):
     return render(request, "core/welcome.html")
 
 
+def _flash_redirect(to, flag):
+    """
+    Redirect with success feedback in a short-lived cookie instead of
+    messages.success, which would add a session write on the auth hot path.
+    The welcome page reads and clears the cookie client-side.
+    """
+    response = redirect(to)
+    response.set_cookie("flash", flag, max_age=10)
+    return response
+
+
 def login_page(request):
     if request.method == "POST":
         email = request.POST.get("email")
@@ -349,18 +476,19 @@ def login_page(request):
 
         user = authenticate(request, username=email, password=pw)
         if user:
-            auth_login(request, user)
-            messages.success(request, f"Logged in as {user.email} ({user.role})")
-            return redirect("welcome")
+            auth_login(request, user, backend=AUTH_BACKEND)
+            request.session["role"] = user.role
+            return _flash_redirect("welcome", "logged_in")
 
         messages.error(request, "Invalid email or password.")
 
     return render(request, "core/login.html")
 
 
-@login_required
-def timezone_settings_view(request):
-    return redirect("settings-view")
+# Legacy shim from before timezone handling moved into settings_view. A
+# cacheable 301 lets browsers skip the round trip entirely on repeat visits,
+# and a bare redirect needs no login wall — the target enforces auth.
+timezone_settings_view = RedirectView.as_view(pattern_name="settings-view", permanent=True)
 
 
 # ==============================================================
@@ -389,20 +517,28 @@ def patient_signup_page(request):
         if serializer.is_valid():
             user = serializer.save()
 
-            tz_str = request.POST.get("timezone") or getattr(settings, "TIME_ZONE", "UTC")
+            tz_str = request.POST.get("timezone")
+            if tz_str not in _TIMEZONE_SET:
+                tz_str = getattr(settings, "TIME_ZONE", "UTC")
             user.timezone = tz_str
             user.save()
 
             request.session["django_timezone"] = tz_str
-            timezone.activate(tz_str)
-
-            auth_login(request, user)
-            messages.success(request, "Patient account created and logged in.")
-            return redirect("welcome")
-
-        for field, errs in serializer.errors.items():
-            for err in errs:
-                messages.error(request, f"{field}: {err}")
+            timezone.activate(get_zoneinfo(tz_str))
+
+            auth_login(request, user, backend=AUTH_BACKEND)
+            request.session["role"] = user.role
+            return _flash_redirect("welcome", "signed_up")
+
+        # One message (and one session write) for the whole error set instead
+        # of a write per field error.
+        err_lines = [
+            f"{field}: {err}"
+            for field, errs in serializer.errors.items()
+            for err in errs
+        ]
+        if err_lines:
+            messages.error(request, "\n".join(err_lines))
 
     return render(request, "core/signup_patient.html", {"timezones": TIMEZONES})
 
@@ -427,20 +563,28 @@ def doctor_signup_page(request):
         if serializer.is_valid():
             user = serializer.save()
 
-            tz_str = request.POST.get("timezone") or getattr(settings, "TIME_ZONE", "UTC")
+            tz_str = request.POST.get("timezone")
+            if tz_str not in _TIMEZONE_SET:
+                tz_str = getattr(settings, "TIME_ZONE", "UTC")
             user.timezone = tz_str
             user.save()
 
             request.session["django_timezone"] = tz_str
-            timezone.activate(tz_str)
-
-            auth_login(request, user)
-            messages.success(request, "Doctor account created and logged in.")
-            return redirect("welcome")
-
-        for field, errs in serializer.errors.items():
-            for err in errs:
-                messages.error(request, f"{field}: {err}")
+            timezone.activate(get_zoneinfo(tz_str))
+
+            auth_login(request, user, backend=AUTH_BACKEND)
+            request.session["role"] = user.role
+            return _flash_redirect("welcome", "signed_up")
+
+        # One message (and one session write) for the whole error set instead
+        # of a write per field error.
+        err_lines = [
+            f"{field}: {err}"
+            for field, errs in serializer.errors.items()
+            for err in errs
+        ]
+        if err_lines:
+            messages.error(request, "\n".join(err_lines))
 
     return render(request, "core/signup_doctor.html", {"timezones": TIMEZONES})
 
@@ -448,10 +592,53 @@ def doctor_signup_page(request):
 # ==============================================================
 #  PATIENT APPOINTMENT VIEWS
 # ==============================================================
+def get_active_doctors_cached():
+    """
+    The booking form loads on every visit but the doctor roster changes
+    rarely; keep the evaluated list cached for a minute. core.signals drops
+    the key on any doctor or profile change.
+    """
+    return cache.get_or_set(
+        ACTIVE_DOCTORS_CACHE_KEY,
+        lambda: list(
+            User.objects.filter(role="doctor", is_active=True)
+            .select_related("doctor_profile")
+            .only(
+                "id", "email",
+                "doctor_profile__full_name",
+                "doctor_profile__specialization",
+            )
+            .order_by("email")
+        ),
+        timeout=60,
+    )
+
+
 @role_required("patient")
 def patient_appointment_list(request):
-    qs = Appointment.objects.filter(patient=request.user).order_by("scheduled_for")
-    blocks = group_appointments_for_patient(qs)
+    # One JOINed SELECT projecting exactly what the grouping helper and the
+    # template read; both of the doctor's profile relations ride along because
+    # display_name probes them. Anything not listed stays deferred.
+    qs = (
+        Appointment.objects.filter(patient=request.user)
+        .select_related(
+            "doctor__doctor_profile",
+            "doctor__patient_profile",
+            "patient",
+            "payment",
+            "rescheduled_from",
+        )
+        .only(
+            "id", "scheduled_for", "status", "reason",
+            "doctor__id", "doctor__email",
+            "doctor__doctor_profile__full_name",
+            "doctor__patient_profile__full_name",
+            "patient__id",
+            "payment__id", "payment__status",
+            "rescheduled_from__id", "rescheduled_from__scheduled_for",
+        )
+    )
+    blocks = group_appointments(qs, partition_by="patient")
     return render(
         request, "core/appointments_patient_list.html",
         {"appointment_blocks": blocks, "now": timezone.now()},
@@ -468,8 +655,6 @@ def patient_appointment_create(request):
     - Template posts slot_start as UTC string (because you used start|utc|date:"Y-m-d\\TH:i")
     - We must parse that as UTC, not as the patient's current timezone.
     """
-    doctors = User.objects.filter(role="doctor", is_active=True).order_by("email")
-
     doctor_param = request.GET.get("doctor_id")
     date_param = request.GET.get("date")
 
@@ -480,8 +665,8 @@ def patient_appointment_create(request):
     if doctor_param and date_param:
         try:
             selected_doctor = User.objects.get(id=doctor_param, role="doctor")
-            selected_date = datetime.strptime(date_param, "%Y-%m-%d").date()
-            available_slots = get_available_slots_for_doctor(selected_doctor, selected_date)
+            selected_date = date.fromisoformat(date_param)
+            available_slots = available_slots_cached(selected_doctor, selected_date)
         except Exception:
             messages.error(request, "Invalid doctor or date selection.")
 
@@ -501,34 +686,49 @@ def patient_appointment_create(request):
 
         try:
             doctor = User.objects.get(id=doc_id, role="doctor")
-            _ = datetime.strptime(date_str, "%Y-%m-%d").date()
+            booked_date = date.fromisoformat(date_str)
         except Exception:
             messages.error(request, "Invalid doctor or date.")
             return redirect("patient-appointment-create")
 
-        created = 0
-        utc = ZoneInfo("UTC")
+        utc = get_zoneinfo("UTC")
 
+        # Phase 1: parse and dedupe every submitted slot before any DB work,
+        # so a malformed or repeated entry can't cost a roundtrip.
+        parsed = set()
         for slot_str in slot_starts:
             try:
                 # slot_str is UTC already
-                slot_naive = datetime.strptime(slot_str, "%Y-%m-%dT%H:%M")
-                slot_start = timezone.make_aware(slot_naive, utc)
+                slot_naive = datetime.fromisoformat(slot_str)
+                parsed.add(timezone.make_aware(slot_naive, utc))
             except ValueError:
                 continue
 
-            if Appointment.objects.filter(doctor=doctor, scheduled_for=slot_start)\
-                .exclude(status="cancelled").exists():
-                continue
-
-            Appointment.objects.create(
+        # Phase 2: one SELECT for every requested slot instead of an exists()
+        # each, then one INSERT for the survivors instead of a create() each.
+        taken = set(
+            Appointment.objects.filter(doctor=doctor, scheduled_for__in=parsed)
+            .exclude(status__in=CANCEL_STATES)
+            .values_list("scheduled_for", flat=True)
+        )
+        new_appts = [
+            Appointment(
                 patient=request.user,
                 doctor=doctor,
-                scheduled_for=slot_start,
+                scheduled_for=s,
                 reason=reason,
                 status="requested",
             )
-            created += 1
+            for s in sorted(parsed)
+            if s not in taken
+        ]
+
+        with transaction.atomic():
+            Appointment.objects.bulk_create(new_appts, ignore_conflicts=True)
+        created = len(new_appts)
+        if created:
+            # bulk_create fires no post_save, so drop the slot cache by hand.
+            invalidate_slots(doctor.id, booked_date)
 
         if created == 0:
             messages.error(request, "Selected slots unavailable.")
@@ -537,9 +737,10 @@ def patient_appointment_create(request):
         messages.success(request, f"Appointment requested for {created} slot(s).")
         return redirect("patient-appointments")
 
+    # Only the render path needs the dropdown; every POST branch redirects.
     return render(
         request, "core/appointments_patient_create.html",
-        {"doctors": doctors, "selected_doctor": selected_doctor,
+        {"doctors": get_active_doctors_cached(), "selected_doctor": selected_doctor,
          "selected_date": selected_date, "available_slots": available_slots},
     )
 
@@ -559,8 +760,8 @@ def patient_reschedule_block(request):
     # These start/end come from links rendered in patient timezone (localtime).
     tz = timezone.get_current_timezone()
     try:
-        naive_start = datetime.strptime(start_str, "%Y-%m-%dT%H:%M")
-        naive_end = datetime.strptime(end_str, "%Y-%m-%dT%H:%M")
+        naive_start = datetime.fromisoformat(start_str)
+        naive_end = datetime.fromisoformat(end_str)
         original_start = timezone.make_aware(naive_start, tz)
         original_end = timezone.make_aware(naive_end, tz)
     except ValueError:
@@ -569,15 +770,19 @@ def patient_reschedule_block(request):
 
     doctor = get_object_or_404(User, id=doctor_id, role="doctor")
 
-    original_qs = Appointment.objects.filter(
-        patient=user,
-        doctor=doctor,
-        scheduled_for__gte=original_start,
-        scheduled_for__lt=original_end,
-    ).exclude(status__in=["cancelled", "completed", "rescheduled"])\
-     .order_by("scheduled_for")
+    # Evaluate once; exists(), first() and the template each re-ran this
+    # queryset before.
+    original_list = list(
+        Appointment.objects.filter(
+            patient=user,
+            doctor=doctor,
+            scheduled_for__gte=original_start,
+            scheduled_for__lt=original_end,
+        ).exclude(status__in=["cancelled", "completed", "rescheduled"])
+        .order_by("scheduled_for")
+    )
 
-    if not original_qs.exists():
+    if not original_list:
         messages.error(request, "No active appointment block found.")
         return redirect("patient-appointments")
 
@@ -592,8 +797,8 @@ def patient_reschedule_block(request):
 
     if selected_date_str:
         try:
-            selected_date = datetime.strptime(selected_date_str, "%Y-%m-%d").date()
-            available_slots = get_available_slots_for_doctor(doctor, selected_date)
+            selected_date = date.fromisoformat(selected_date_str)
+            available_slots = available_slots_cached(doctor, selected_date)
         except ValueError:
             pass
 
@@ -607,7 +812,7 @@ def patient_reschedule_block(request):
 
         # new_slot is rendered from available_slots andz: it is in CURRENT timezone (patient), not UTC.
         try:
-            naive_new_start = datetime.strptime(new_slot, "%Y-%m-%dT%H:%M")
+            naive_new_start = datetime.fromisoformat(new_slot)
             new_start = timezone.make_aware(naive_new_start, tz)
         except ValueError:
             messages.error(request, "Invalid new slot.")
@@ -617,27 +822,25 @@ def patient_reschedule_block(request):
             messages.error(request, "Cannot reschedule to past.")
             return redirect("patient-appointments")
 
-        conflict = Appointment.objects.filter(
-            doctor=doctor,
-            scheduled_for=new_start,
-        ).exclude(status__in=["cancelled", "rejected", "rescheduled"]).exists()
+        original_root = original_list[0]
 
-        if conflict:
+        # No pre-flight exists(): the uniq_active_slot constraint detects a
+        # concurrently taken slot at INSERT time, which also closes the
+        # check-then-create race the old SELECT left open.
+        try:
+            with transaction.atomic():
+                Appointment.objects.create(
+                    patient=user,
+                    doctor=doctor,
+                    scheduled_for=new_start,
+                    reason=original_root.reason,
+                    status="reschedule_requested",
+                    rescheduled_from=original_root,
+                )
+        except IntegrityError:
             messages.error(request, "Slot just taken. Pick another.")
             return redirect(request.get_full_path())
 
-        original_root = original_qs.first()
-        new_reason = original_root.reason
-
-        Appointment.objects.create(
-            patient=user,
-            doctor=doctor,
-            scheduled_for=new_start,
-            reason=new_reason,
-            status="reschedule_requested",
-            rescheduled_from=original_root,
-        )
-
         messages.success(request, "Your appointment has been rescheduled.")
         return redirect("patient-appointments")
 
@@ -645,7 +848,7 @@ def patient_reschedule_block(request):
         "doctor": doctor,
         "original_start": original_start,
         "original_end": original_end,
-        "original_block_appointments": original_qs,
+        "original_block_appointments": original_list,
         "selected_date": selected_date,
         "available_slots": available_slots,
         "doctor_id": doctor_id,
@@ -660,18 +863,26 @@ def patient_reschedule_block(request):
 # ==============================================================
 @role_required("doctor")
 def doctor_appointment_list(request):
-    qs = Appointment.objects.filter(doctor=request.user).order_by("scheduled_for")
-    blocks = group_appointments_for_doctor(qs)
-
-    for block in blocks:
-        slot_ranges = []
-        for appt in block["slots"]:
-            slot_ranges.append({
-                "id": appt.id,
-                "start": appt.scheduled_for,
-                "end": appt.scheduled_for + SLOT_DELTA,
-            })
-        block["slot_ranges"] = slot_ranges
+    qs = (
+        Appointment.objects.filter(doctor=request.user)
+        .select_related(
+            "patient__patient_profile",
+            "patient__doctor_profile",
+            "doctor",
+            "payment",
+            "rescheduled_from",
+        )
+        .only(
+            "id", "scheduled_for", "status", "reason",
+            "patient__id", "patient__email",
+            "patient__patient_profile__full_name",
+            "patient__doctor_profile__full_name",
+            "doctor__id",
+            "payment__id", "payment__status",
+            "rescheduled_from__id", "rescheduled_from__scheduled_for",
+        )
+    )
+    blocks = group_appointments(qs, partition_by="doctor")
 
     return render(
         request, "core/appointments_doctor_list.html",
@@ -691,49 +902,67 @@ def doctor_update_appointments(request):
         messages.error(request, "No slots selected.")
         return redirect("doctor-appointments")
 
-    appointments = list(
-        Appointment.objects.filter(id__in=slot_ids, doctor=request.user)
-        .order_by("scheduled_for")
-    )
-    if not appointments:
+    # Kept as a queryset: cancel_slots never needs row objects, and
+    # set_status only needs a few columns, so materialization is deferred
+    # to the branch that actually wants it.
+    qs = Appointment.objects.filter(id__in=slot_ids, doctor=request.user)
+    if not qs.exists():
         messages.error(request, "No matching appointments.")
         return redirect("doctor-appointments")
 
     if mode == "set_status":
         new_status = request.POST.get("new_status")
 
-        if new_status not in [
-            "requested", "approved", "rejected",
-            "completed", "cancelled", "reschedule_requested"
-        ]:
+        if new_status not in VALID_STATUSES:
             messages.error(request, "Invalid status.")
             return redirect("doctor-appointments")
 
-        for appt in appointments:
-            if new_status == "approved" and appt.rescheduled_from:
-                original = appt.rescheduled_from
-                original.delete()
-                appt.status = "approved"
-                appt.save()
-                continue
-
-            if new_status in ["rejected", "cancelled"] and appt.rescheduled_from:
-                appt.delete()
-                continue
-
-            appt.status = new_status
-            appt.save()
+        # Partition once, then hit the DB with at most two DELETEs and one
+        # UPDATE instead of a save()/delete() per slot.
+        now = timezone.now()
+        to_update = []
+        to_delete_ids = []
+        original_ids = []
+
+        for appt in qs.only("id", "status", "scheduled_for", "rescheduled_from"):
+            if appt.rescheduled_from_id:
+                if new_status == "approved":
+                    # Approving a reschedule replaces the original block.
+                    original_ids.append(appt.rescheduled_from_id)
+                elif new_status in ["rejected", "cancelled"]:
+                    # Rejecting a reschedule just drops the request.
+                    to_delete_ids.append(appt.id)
+                    continue
+            # Re-applying the current status (a doctor re-approving an
+            # approved block) shouldn't reach the DB at all.
+            if appt.status != new_status:
+                to_update.append(appt)
+
+        if original_ids:
+            Appointment.objects.filter(id__in=original_ids).delete()
+        if to_delete_ids:
+            Appointment.objects.filter(id__in=to_delete_ids).delete()
+        if to_update:
+            # Every survivor gets the same status, so a plain UPDATE beats
+            # bulk_update's per-row CASE expression.
+            Appointment.objects.filter(id__in=[a.id for a in to_update]).update(
+                status=new_status, updated_at=now
+            )
+            # QuerySet.update fires no post_save; the deletes above did signal.
+            for day in {a.scheduled_for.date() for a in to_update}:
+                invalidate_slots(request.user.id, day)
 
         messages.success(request, f"Status updated to '{new_status}' for selected block.")
         return redirect("doctor-appointments")
 
     elif mode == "cancel_slots":
-        count = 0
-        for appt in appointments:
-            if appt.status != "cancelled":
-                appt.status = "cancelled"
-                appt.save()
-                count += 1
+        count = (
+            qs.exclude(status="cancelled")
+            .update(status="cancelled", updated_at=timezone.now())
+        )
+        if count:
+            for day in {when.date() for when in qs.values_list("scheduled_for", flat=True)}:
+                invalidate_slots(request.user.id, day)
 
         if count == 0:
             messages.info(request, "No slots were cancelled.")
@@ -760,15 +989,19 @@ def payment_page(request):
 
 
 @role_required("patient")
-def create_checkout_session(request):
+async def create_checkout_session(request):
+    # Async so the worker is free to serve other requests during the
+    # several-hundred-ms Stripe round trip (under ASGI; WSGI still runs
+    # this through Django's async adapter with no behavior change).
     if request.method != "POST":
         return HttpResponseNotAllowed(["POST"])
 
     amount_cents = 5000
     currency = "usd"
+    user = await request.auser()
 
-    payment = Payment.objects.create(
-        user=request.user,
+    payment = await Payment.objects.acreate(
+        user=user,
         amount_cents=amount_cents,
         currency=currency,
         status="pending",
@@ -776,7 +1009,11 @@ def create_checkout_session(request):
     )
 
     try:
-        session = stripe.checkout.Session.create(
+        # The SDK call is blocking; thread_sensitive=False pushes it onto
+        # the shared executor instead of the single ORM thread.
+        session = await sync_to_async(
+            _stripe().checkout.Session.create, thread_sensitive=False
+        )(
             mode="payment",
             line_items=[{
                 "price_data": {
@@ -786,18 +1023,18 @@ def create_checkout_session(request):
                 },
                 "quantity": 1,
             }],
-            customer_email=request.user.email,
+            customer_email=user.email,
             success_url=request.build_absolute_uri(reverse("payment-success"))
             + "?session_id={CHECKOUT_SESSION_ID}",
             cancel_url=request.build_absolute_uri(reverse("payment-cancel")),
         )
     except Exception as e:
         payment.status = "failed"
-        payment.save()
+        await payment.asave(update_fields=["status", "updated_at"])
         return HttpResponseBadRequest(f"Stripe error: {e}")
 
     payment.stripe_session_id = session.id
-    payment.save()
+    await payment.asave(update_fields=["stripe_session_id", "updated_at"])
 
     return redirect(session.url)
 
@@ -809,14 +1046,23 @@ def payment_success(request):
         return HttpResponseBadRequest("Missing session_id")
 
     try:
-        session = stripe.checkout.Session.retrieve(session_id)
-        payment = Payment.objects.get(stripe_session_id=session.id, user=request.user)
-    except Exception:
+        payment = Payment.objects.only(
+            "id", "status", "amount_cents", "stripe_session_id"
+        ).get(stripe_session_id=session_id, user=request.user)
+    except Payment.DoesNotExist:
         return HttpResponseBadRequest("Invalid session or payment missing")
 
-    if session.payment_status == "paid":
-        payment.status = "paid"
-        payment.save()
+    # Refreshes of the success page after the payment is recorded shouldn't
+    # cost a Stripe round trip; only still-pending payments need confirming.
+    if payment.status != "paid":
+        try:
+            session = _stripe().checkout.Session.retrieve(session_id)
+        except Exception:
+            return HttpResponseBadRequest("Invalid session or payment missing")
+
+        if session.payment_status == "paid":
+            payment.status = "paid"
+            payment.save(update_fields=["status", "updated_at"])
 
     return render(
         request,
@@ -833,15 +1079,26 @@ def payment_cancel(request):
 # ==============================================================
 #  API (DRF) VIEWS
 # ==============================================================
+# Shared, stateless permission instances. DRF's default get_permissions()
+# instantiates every class in permission_classes per request; these
+# overrides hand back the same objects instead.
+_ALLOW_ANY = (permissions.AllowAny(),)
+_IS_AUTHENTICATED = (permissions.IsAuthenticated(),)
+
+
 class PatientSignupView(generics.CreateAPIView):
     serializer_class = PatientSignupSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get_permissions(self):
+        return _ALLOW_ANY
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        auth_login(request, user)
+        auth_login(request, user, backend=AUTH_BACKEND)
+        request.session["role"] = user.role
         return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
 
 
@@ -849,28 +1106,39 @@ class DoctorSignupView(generics.CreateAPIView):
     serializer_class = DoctorSignupSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get_permissions(self):
+        return _ALLOW_ANY
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        auth_login(request, user)
+        auth_login(request, user, backend=AUTH_BACKEND)
+        request.session["role"] = user.role
         return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
 
 
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
 
+    def get_permissions(self):
+        return _ALLOW_ANY
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
-        auth_login(request, user)
+        auth_login(request, user, backend=AUTH_BACKEND)
+        request.session["role"] = user.role
         return Response(UserSerializer(user).data, status=status.HTTP_200_OK)
 
 
 class MeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_permissions(self):
+        return _IS_AUTHENTICATED
+
     def get(self, request):
         return Response(UserSerializer(request.user).data)
 
@@ -878,9 +1146,48 @@ class MeView(APIView):
 # ==============================================================
 #  PROFILE VIEW (HTML)
 # ==============================================================
+# Profile columns the edit form may write, so the POST scan is one
+# comprehension instead of a hand-maintained dict literal per role.
+PATIENT_EDITABLE = (
+    "full_name",
+    "date_of_birth",
+    "gender",
+    "contact_number",
+    "address",
+    "emergency_contact",
+    "insurance_provider",
+    "insurance_policy_number",
+)
+DOCTOR_EDITABLE = (
+    "full_name",
+    "specialization",
+    "contact_number",
+    "clinic_name",
+    "clinic_address",
+)
+
+
+def _save_changed_fields(instance, updates):
+    """Apply a field -> value mapping and save only what actually changed."""
+    changed = []
+    for field, value in updates.items():
+        if getattr(instance, field) != value:
+            setattr(instance, field, value)
+            changed.append(field)
+    if changed:
+        instance.save(update_fields=changed)
+    return changed
+
+
 @login_required
 def profile_view(request):
-    user = request.user
+    # One JOINed fetch instead of two lazy reverse-OneToOne queries when the
+    # profiles are touched below and again in the template. Rebinding
+    # request.user lets the navbar's display_name reuse the cached relations
+    # instead of re-probing them on the middleware-loaded instance.
+    user = request.user = User.objects.select_related(
+        "patient_profile", "doctor_profile"
+    ).get(pk=request.user.pk)
     patient_profile = getattr(user, "patient_profile", None)
     doctor_profile = getattr(user, "doctor_profile", None)
 
@@ -888,38 +1195,43 @@ def profile_view(request):
         action = request.POST.get("action")
 
         if action == "update_profile":
-            new_email = request.POST.get("email", "").strip()
-            if new_email and new_email != user.email:
-                if User.objects.filter(email=new_email).exclude(id=user.id).exists():
-                    messages.error(request, "That email is already in use.")
-                else:
-                    user.email = new_email
-                    user.save()
-                    messages.success(request, "Email updated.")
-
-            if patient_profile:
-                patient_profile.full_name = request.POST.get("full_name", patient_profile.full_name)
-                patient_profile.date_of_birth = normalize_dob_input(
-                    request.POST.get("date_of_birth", patient_profile.date_of_birth)
-                )
-                patient_profile.gender = request.POST.get("gender", patient_profile.gender)
-                patient_profile.contact_number = request.POST.get("contact_number", patient_profile.contact_number)
-                patient_profile.address = request.POST.get("address", patient_profile.address)
-                patient_profile.emergency_contact = request.POST.get("emergency_contact", patient_profile.emergency_contact)
-                patient_profile.insurance_provider = request.POST.get("insurance_provider", patient_profile.insurance_provider)
-                patient_profile.insurance_policy_number = request.POST.get("insurance_policy_number", patient_profile.insurance_policy_number)
-                patient_profile.save()
-
-            if doctor_profile:
-                doctor_profile.full_name = request.POST.get("full_name", doctor_profile.full_name)
-                doctor_profile.specialization = request.POST.get("specialization", doctor_profile.specialization)
-                doctor_profile.contact_number = request.POST.get("contact_number", doctor_profile.contact_number)
-                doctor_profile.clinic_name = request.POST.get("clinic_name", doctor_profile.clinic_name)
-                doctor_profile.clinic_address = request.POST.get("clinic_address", doctor_profile.clinic_address)
-                doctor_profile.save()
+            # Email change and profile update commit together — one
+            # transaction (and one WAL fsync) instead of one per save.
+            with transaction.atomic():
+                new_email = request.POST.get("email", "").strip()
+                if new_email and new_email != user.email:
+                    # One conditional UPDATE instead of SELECT-then-UPDATE:
+                    # the NOT EXISTS guard runs inside the same statement,
+                    # so there is no window for another request to claim
+                    # the address between check and write.
+                    taken = User.objects.filter(email=new_email).exclude(id=user.id)
+                    rows = (
+                        User.objects.filter(pk=user.pk)
+                        .filter(~Exists(taken))
+                        .update(email=new_email)
+                    )
+                    if rows:
+                        user.email = new_email
+                        messages.success(request, "Email updated.")
+                    else:
+                        messages.error(request, "That email is already in use.")
+
+                if patient_profile:
+                    updates = {
+                        f: request.POST[f] for f in PATIENT_EDITABLE if f in request.POST
+                    }
+                    if "date_of_birth" in updates:
+                        updates["date_of_birth"] = normalize_dob_input(updates["date_of_birth"])
+                    _save_changed_fields(patient_profile, updates)
+
+                if doctor_profile:
+                    updates = {
+                        f: request.POST[f] for f in DOCTOR_EDITABLE if f in request.POST
+                    }
+                    _save_changed_fields(doctor_profile, updates)
 
             messages.success(request, "Profile updated.")
-            return redirect("profile")
+            return HttpResponseRedirect(_url("profile"))
 
         elif action == "change_password":
             current_pw = request.POST.get("current_password")
@@ -930,23 +1242,34 @@ def profile_view(request):
                 messages.error(request, "Current password is incorrect.")
             elif not new_pw1 or new_pw1 != new_pw2:
                 messages.error(request, "New passwords do not match.")
+            elif user.check_password(new_pw1):
+                # Nothing to persist — skip the UPDATE and session rotation.
+                messages.success(request, "Password unchanged.")
             else:
                 user.set_password(new_pw1)
-                user.save()
+                user.save(update_fields=["password"])
                 update_session_auth_hash(request, user)
                 messages.success(request, "Password changed successfully.")
 
-            return redirect("profile")
+            return HttpResponseRedirect(_url("profile"))
 
         elif action == "upload_image":
             img = request.FILES.get("profile_image")
             if not img:
                 messages.error(request, "Please choose an image to upload.")
             else:
+                # verify() walks the file without decoding full frames; it
+                # consumes the handle, so rewind before handing it to storage.
+                try:
+                    Image.open(img).verify()
+                except (UnidentifiedImageError, OSError):
+                    messages.error(request, "That file is not a valid image.")
+                    return HttpResponseRedirect(_url("profile"))
+                img.seek(0)
                 user.profile_image = img
-                user.save()
+                user.save(update_fields=["profile_image"])
                 messages.success(request, "Profile image updated.")
-            return redirect("profile")
+            return HttpResponseRedirect(_url("profile"))
 
     return render(
         request,
@@ -964,6 +1287,8 @@ def profile_view(request):
 # ==============================================================
 @login_required
 def documents_view(request):
+    user = request.user
+
     if request.method == "POST":
         uploaded = request.FILES.get("file")
         doc_type = request.POST.get("document_type", "other")
@@ -973,9 +1298,9 @@ def documents_view(request):
             messages.error(request, "Please choose a file.")
         else:
             Document.objects.create(
-                owner_user=request.user,
-                uploaded_by_user=request.user,
-                uploader_role=request.user.role,
+                owner_user=user,
+                uploaded_by_user=user,
+                uploader_role=user.role,
                 file_name=file_name,
                 file=uploaded,
                 document_type=doc_type,
@@ -984,27 +1309,58 @@ def documents_view(request):
 
         return redirect("documents")
 
-    docs = Document.objects.filter(owner_user=request.user).order_by("-created_at")
-    return render(request, "core/documents.html", {"documents": docs})
+    # The list never dereferences owner/uploader, so no join — just the
+    # columns the table shows, one page at a time.
+    docs = (
+        Document.objects.filter(owner_user=user)
+        .only("id", "file_name", "document_type", "file", "created_at")
+        .order_by("-created_at")
+    )
+    page = Paginator(docs, 25).get_page(request.GET.get("page"))
+    return render(request, "core/documents.html", {"documents": page})
 
 
 # ==============================================================
 #  PRESCRIPTION VIEWS
 # ==============================================================
+def _prescriptions_none(user):
+    return Prescription.objects.none()
+
+
+# Role → base queryset, built once at import instead of re-branching on
+# every listing. Unknown roles fall through to an empty queryset.
+_PRESCRIPTION_QS = {
+    "patient": lambda u: Prescription.objects.filter(patient=u),
+    "doctor": lambda u: Prescription.objects.filter(doctor=u),
+    "admin": lambda u: Prescription.objects.all(),
+}
+
+
 @login_required
 def prescriptions_view(request):
     user = request.user
+    qs = _PRESCRIPTION_QS.get(user.role, _prescriptions_none)(user)
+
+    # The table renders only the counterparty emails, so project just those
+    # columns alongside the prescription fields it shows.
+    prescriptions = (
+        qs.select_related("patient", "doctor")
+        .only(
+            "id",
+            "title",
+            "status",
+            "file",
+            "created_at",
+            "patient__id",
+            "patient__email",
+            "doctor__id",
+            "doctor__email",
+        )
+        .order_by("-created_at")
+    )
+    page = Paginator(prescriptions, 25).get_page(request.GET.get("page"))
 
-    if getattr(user, "is_patient", False):
-        prescriptions = Prescription.objects.filter(patient=user).order_by("-created_at")
-    elif getattr(user, "is_doctor", False):
-        prescriptions = Prescription.objects.filter(doctor=user).order_by("-created_at")
-    elif getattr(user, "is_admin", False):
-        prescriptions = Prescription.objects.all().order_by("-created_at")
-    else:
-        prescriptions = Prescription.objects.none()
-
-    return render(request, "core/prescriptions.html", {"prescriptions": prescriptions})
+    return render(request, "core/prescriptions.html", {"prescriptions": page})
 
 
 # ==============================================================
@@ -1019,21 +1375,32 @@ def settings_view(request):
         timezone_name = request.POST.get("timezone")
         location_tracking = bool(request.POST.get("location_tracking"))
 
-        if theme in ("light", "dark"):
+        # UPDATE only the settings columns that actually changed; a
+        # resubmitted-but-identical form skips the write entirely.
+        dirty = []
+
+        if theme in VALID_THEMES and user.theme_preference != theme:
             user.theme_preference = theme
+            dirty.append("theme_preference")
 
-        user.location_tracking_enabled = location_tracking
+        if user.location_tracking_enabled != location_tracking:
+            user.location_tracking_enabled = location_tracking
+            dirty.append("location_tracking_enabled")
 
-        if timezone_name:
-            user.timezone = timezone_name
+        if timezone_name in _TIMEZONE_SET:
+            new_tz = timezone_name
             request.session["django_timezone"] = timezone_name
-            timezone.activate(timezone_name)
+            timezone.activate(get_zoneinfo(timezone_name))
         else:
-            user.timezone = getattr(settings, "TIME_ZONE", "UTC")
+            new_tz = getattr(settings, "TIME_ZONE", "UTC")
             request.session.pop("django_timezone", None)
             timezone.deactivate()
+        if user.timezone != new_tz:
+            user.timezone = new_tz
+            dirty.append("timezone")
 
-        user.save()
+        if dirty:
+            user.save(update_fields=dirty)
         messages.success(request, "Settings updated.")
         return redirect("settings-view")
 
@@ -1063,7 +1430,7 @@ def doctor_schedule_view(request):
     selected_date = None
     if date_param:
         try:
-            selected_date = datetime.strptime(date_param, "%Y-%m-%d").date()
+            selected_date = date.fromisoformat(date_param)
         except ValueError:
             selected_date = None
 
@@ -1074,7 +1441,7 @@ def doctor_schedule_view(request):
             return redirect(request.get_full_path())
 
         try:
-            naive_start = datetime.strptime(slot_str, "%Y-%m-%dT%H:%M")
+            naive_start = datetime.fromisoformat(slot_str)
         except ValueError:
             messages.error(request, "Invalid slot timestamp.")
             return redirect(request.get_full_path())
@@ -1095,36 +1462,56 @@ def doctor_schedule_view(request):
             return redirect(request.get_full_path())
 
         slot_date = slot_start.date()
-        try:
-            window = DoctorAvailability.objects.get(
-                doctor=doctor,
-                date=slot_date,
-                start_time__lte=slot_start.time(),
-                end_time__gte=slot_end.time(),
-            )
-        except DoctorAvailability.DoesNotExist:
-            messages.error(request, "No availability window for this slot.")
-            return redirect(request.get_full_path())
 
-        s, e = window.start_time, window.end_time
-
-        if s == slot_start.time() and e == slot_end.time():
-            window.delete()
-        elif s == slot_start.time() and slot_end.time() < e:
-            window.start_time = slot_end.time()
-            window.save()
-        elif s < slot_start.time() and slot_end.time() == e:
-            window.end_time = slot_start.time()
-            window.save()
-        else:
-            DoctorAvailability.objects.create(
+        # Whole-window deletion is the common case: try a single DELETE on
+        # the exact bounds first and let the rowcount decide, skipping the
+        # SELECT entirely. Only a shrink/split needs to read the window,
+        # and that path locks it so two concurrent deletes can't both read
+        # the old bounds; the (doctor, date) index makes this a point
+        # lookup. select_for_update is a no-op on SQLite but real under
+        # Postgres.
+        with transaction.atomic():
+            deleted, _ = DoctorAvailability.objects.filter(
                 doctor=doctor,
                 date=slot_date,
-                start_time=slot_end.time(),
-                end_time=e,
+                start_time=slot_start.time(),
+                end_time=slot_end.time(),
+            ).delete()
+            if deleted:
+                messages.success(request, "Slot removed.")
+                return redirect(request.get_full_path())
+
+            window = (
+                DoctorAvailability.objects.select_for_update()
+                .filter(
+                    doctor=doctor,
+                    date=slot_date,
+                    start_time__lte=slot_start.time(),
+                    end_time__gte=slot_end.time(),
+                )
+                .first()
             )
-            window.end_time = slot_start.time()
-            window.save()
+            if window is None:
+                messages.error(request, "No availability window for this slot.")
+                return redirect(request.get_full_path())
+
+            s, e = window.start_time, window.end_time
+
+            if s == slot_start.time() and slot_end.time() < e:
+                window.start_time = slot_end.time()
+                window.save(update_fields=["start_time"])
+            elif s < slot_start.time() and slot_end.time() == e:
+                window.end_time = slot_start.time()
+                window.save(update_fields=["end_time"])
+            else:
+                DoctorAvailability.objects.create(
+                    doctor=doctor,
+                    date=slot_date,
+                    start_time=slot_end.time(),
+                    end_time=e,
+                )
+                window.end_time = slot_start.time()
+                window.save(update_fields=["end_time"])
 
         messages.success(request, "Slot removed.")
         return redirect(request.get_full_path())
@@ -1136,31 +1523,42 @@ def doctor_schedule_view(request):
 
         if not (date_str and start_str and end_str):
             messages.error(request, "Select date, start time, and end time.")
-            return redirect("doctor-schedule")
+            return HttpResponseRedirect(_url("doctor-schedule"))
 
         try:
-            d = datetime.strptime(date_str, "%Y-%m-%d").date()
-            start_t = datetime.strptime(start_str, "%H:%M").time()
-            end_t = datetime.strptime(end_str, "%H:%M").time()
+            d = date.fromisoformat(date_str)
+            start_t = time.fromisoformat(start_str)
+            end_t = time.fromisoformat(end_str)
         except ValueError:
             messages.error(request, "Invalid date or time.")
-            return redirect("doctor-schedule")
+            return HttpResponseRedirect(_url("doctor-schedule"))
 
         if start_t >= end_t:
             messages.error(request, "Start must be before end.")
-            return redirect("doctor-schedule")
-
-        obj, created = DoctorAvailability.objects.update_or_create(
-            doctor=doctor,
-            date=d,
-            defaults={"start_time": start_t, "end_time": end_t},
-        )
+            return HttpResponseRedirect(_url("doctor-schedule"))
+
+        # A date can legitimately hold several windows once delete_slot has
+        # split one, so a (doctor, date) unique upsert can't apply here —
+        # and update_or_create's get() would crash on exactly those dates.
+        # Saving a date's hours replaces whatever windows it had, in one
+        # transaction (one commit).
+        with transaction.atomic():
+            DoctorAvailability.objects.filter(doctor=doctor, date=d).delete()
+            DoctorAvailability.objects.create(
+                doctor=doctor, date=d, start_time=start_t, end_time=end_t
+            )
 
-        messages.success(request, f"Availability {'created' if created else 'updated'} for {d}.")
+        messages.success(request, f"Availability saved for {d}.")
         return redirect(request.path + f"?date={d.isoformat()}")
 
-    windows = DoctorAvailability.objects.filter(doctor=doctor).order_by("date", "start_time")
-    available_slots = get_available_slots_for_doctor(doctor, selected_date) if selected_date else []
+    # Past windows can't be booked or edited, so don't ship them; .only()
+    # keeps the rows to the four columns the table renders.
+    windows = (
+        DoctorAvailability.objects.filter(doctor=doctor, date__gte=timezone.localdate())
+        .only("id", "date", "start_time", "end_time")
+        .order_by("date", "start_time")
+    )
+    available_slots = available_slots_cached(doctor, selected_date) if selected_date else []
 
     return render(
         request, "core/doctor_schedule.html",
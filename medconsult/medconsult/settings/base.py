@@ -51,7 +51,13 @@ AUTH_USER_MODEL = "core.User"
 # Middleware
 # ----------------------------------------------------
 MIDDLEWARE = [
+    # First: answers /healthz, /robots.txt and /favicon.ico before any
+    # session/auth/resolver work happens.
+    "core.middleware.FastPathMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Turns 200s into empty 304s when If-None-Match/If-Modified-Since
+    # validators match; media responses carry an ETag for this.
+    "django.middleware.http.ConditionalGetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -61,6 +67,10 @@ MIDDLEWARE = [
 
     # Your timezone middleware (keep)
     "core.middleware.UserTimezoneMiddleware",
+
+    # Last: dispatches static GET/HEAD paths from a dict trie instead of
+    # the regex resolver, once all request middleware above has run.
+    "core.trie_resolver.TrieResolverMiddleware",
 ]
 
 ROOT_URLCONF = "medconsult.urls"
@@ -131,11 +141,19 @@ STATICFILES_DIRS = [BASE_DIR / "core" / "static"]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads above 1 MiB spill to a TemporaryUploadedFile on disk instead of
+# being buffered whole in request memory (Django default is 2.5 MiB).
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1 * 1024 * 1024
+
 # ----------------------------------------------------
 # Security toggles (safe defaults; prod overrides)
 # ----------------------------------------------------
 CSRF_TRUSTED_ORIGINS = env.list("DJANGO_CSRF_TRUSTED_ORIGINS", default=[])
 
+# Deployments that don't expose /admin/ can switch it off to keep the
+# admin URLPatterns out of the resolver entirely.
+ENABLE_ADMIN = env.bool("DJANGO_ENABLE_ADMIN", default=True)
+
 SESSION_COOKIE_SECURE = env.bool("DJANGO_SESSION_COOKIE_SECURE", default=False)
 CSRF_COOKIE_SECURE = env.bool("DJANGO_CSRF_COOKIE_SECURE", default=False)
 SECURE_SSL_REDIRECT = env.bool("DJANGO_SECURE_SSL_REDIRECT", default=False)
@@ -155,6 +173,9 @@ REST_FRAMEWORK = {
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Batch size for bulk_create-based import paths (see core.models.UserManager)
+BULK_BATCH_SIZE = env.int("BULK_BATCH_SIZE", default=500)
+
 # ----------------------------------------------------
 # Stripe keys (already in your project)
 # ----------------------------------------------------
@@ -1,58 +1,122 @@
+from sys import intern as _n
+
 from django.conf import settings
-from django.conf.urls.static import static
-from django.contrib import admin
-from django.contrib.auth import views as auth_views
-from django.urls import path
+from django.urls import include, path, re_path
 
 from core import views
 
 
+# Routes sharing a prefix live in their own sub-list so the resolver
+# matches the prefix once and only descends into the matching subtree,
+# instead of scanning every sibling of every other section.
+signup_patterns = [
+    path("patient/", views.patient_signup_page, name=_n("signup-patient-page")),
+    path("doctor/", views.doctor_signup_page, name=_n("signup-doctor-page")),
+]
 
-urlpatterns = [
-    path("admin/", admin.site.urls),
+patient_patterns = [
+    path("appointments/", views.patient_appointment_list, name=_n("patient-appointments")),
+    path("appointments/new/", views.patient_appointment_create, name=_n("patient-appointment-create")),
+    path("appointments/reschedule/", views.patient_reschedule_block, name=_n("patient-appointment-reschedule")),
+]
 
-    # Landing / auth
-    path("", views.welcome_page, name="welcome"),
-    path("login/", views.login_page, name="login-page"),
-    path("logout/", views.logout_view, name="logout-view"),
+doctor_patterns = [
+    path("appointments/", views.doctor_appointment_list, name=_n("doctor-appointments")),
+    path("appointments/update/", views.doctor_update_appointments, name=_n("doctor-appointments-update")),
+    path("schedule/", views.doctor_schedule_view, name=_n("doctor-schedule")),
+]
 
-    # Signup (HTML)
-    path("signup/patient/", views.patient_signup_page, name="signup-patient-page"),
-    path("signup/doctor/", views.doctor_signup_page, name="signup-doctor-page"),
+payment_patterns = [
+    path("", views.payment_page, name=_n("payment-page")),
+    path("create-checkout-session/", views.create_checkout_session, name=_n("create-checkout-session")),
+    path("success/", views.payment_success, name=_n("payment-success")),
+    path("cancel/", views.payment_cancel, name=_n("payment-cancel")),
+]
+
+doctors_patterns = [
+    path("", views.doctor_search_view, name=_n("doctor-search")),
+    path("<uuid:doctor_id>/", views.doctor_detail_view, name=_n("doctor-detail")),
+]
 
-    # Profiles / documents / settings
-    path("profile/", views.profile_view, name="profile"),
-    path("documents/", views.documents_view, name="documents"),
-    path("prescriptions/", views.prescriptions_view, name="prescriptions"),
-    path("settings/", views.settings_view, name="settings-view"),
 
+# Ordered by expected request frequency — do not alphabetize. The resolver
+# scans top to bottom, so the day-to-day appointment/API traffic sits first
+# and once-per-session auth plus admin sit last.
+urlpatterns = (
     # Patient appointments
-    path("patient/appointments/", views.patient_appointment_list, name="patient-appointments"),
-    path("patient/appointments/new/", views.patient_appointment_create, name="patient-appointment-create"),
-    path("patient/appointments/reschedule/", views.patient_reschedule_block, name="patient-appointment-reschedule"),
+    path("patient/", include(patient_patterns)),
 
     # Doctor appointments
-    path("doctor/appointments/", views.doctor_appointment_list, name="doctor-appointments"),
-    path("doctor/appointments/update/", views.doctor_update_appointments, name="doctor-appointments-update"),
-    path("doctor/schedule/", views.doctor_schedule_view, name="doctor-schedule"),
+    path("doctor/", include(doctor_patterns)),
 
-    # Payments
-    path("payment/", views.payment_page, name="payment-page"),
-    path("payment/create-checkout-session/", views.create_checkout_session, name="create-checkout-session"),
-    path("payment/success/", views.payment_success, name="payment-success"),
-    path("payment/cancel/", views.payment_cancel, name="payment-cancel"),
+    # API (DRF) — nested resolver, matched once on the "api/" prefix
+    path("api/", include("core.api_urls")),
 
-    # API (DRF)
-    path("api/signup/patient/", views.PatientSignupView.as_view(), name="api-patient-signup"),
-    path("api/signup/doctor/", views.DoctorSignupView.as_view(), name="api-doctor-signup"),
-    path("api/login/", views.LoginView.as_view(), name="api-login"),
-    path("api/me/", views.MeView.as_view(), name="api-me"),
+    # Profiles / documents / settings
+    path("profile/", views.profile_view, name=_n("profile")),
+    path("documents/", views.documents_view, name=_n("documents")),
+    path("prescriptions/", views.prescriptions_view, name=_n("prescriptions")),
+    path("settings/", views.settings_view, name=_n("settings-view")),
+
+    # Payments
+    path("payment/", include(payment_patterns)),
 
     # 🔍 Step 4 — Doctor search & detail
-    path("doctors/", views.doctor_search_view, name="doctor-search"),
-    path("doctors/<uuid:doctor_id>/", views.doctor_detail_view, name="doctor-detail"),
-]
+    path("doctors/", include(doctors_patterns)),
+
+    # Landing / auth
+    path("", views.welcome_page, name=_n("welcome")),
+    path("login/", views.login_page, name=_n("login-page")),
+    path("logout/", views.logout_view, name=_n("logout-view")),
+
+    # Signup (HTML)
+    path("signup/", include(signup_patterns)),
+)
+
+
+# Deployments that don't expose /admin/ skip importing the admin machinery
+# and keep its ~40 URLPatterns out of the resolver's scan list entirely.
+if getattr(settings, "ENABLE_ADMIN", True):
+    from django.contrib import admin
+
+    urlpatterns = urlpatterns + (path("admin/", admin.site.urls),)
 
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Media serving (and its imports) exists only under DEBUG; production
+    # fronts media with a real web server.
+    import os
+    import re
+
+    from django.views.static import serve
+
+    def _serve_with_validators(request, path, document_root=None):
+        """django.views.static.serve plus an ETag and Cache-Control.
+
+        serve() only emits Last-Modified; with an ETag
+        ConditionalGetMiddleware can answer repeat media loads with an
+        empty 304 instead of re-sending the file body.
+        """
+        response = serve(request, path, document_root=document_root)
+        if response.status_code == 200:
+            stat = os.fstat(response.file_to_stream.fileno())
+            response["ETag"] = f'"{int(stat.st_mtime)}-{stat.st_size}"'
+            response["Cache-Control"] = "public, max-age=86400"
+        return response
+
+    urlpatterns = urlpatterns + (
+        re_path(
+            r"^%s(?P<path>.*)$" % re.escape(settings.MEDIA_URL.lstrip("/")),
+            _serve_with_validators,
+            kwargs={"document_root": settings.MEDIA_ROOT},
+        ),
+    )
+
+
+# Build the reverse/namespace dicts now, at boot, rather than lazily on the
+# first reverse() of the first request. By this point urlpatterns is final
+# (admin and media appends included), and __name__ hits the same resolver
+# cache entry as ROOT_URLCONF.
+from django.urls import get_resolver
+
+get_resolver(__name__)._populate()